@@ -1,13 +1,22 @@
 import os
+import re
+import asyncio
 import logging
-from telegram import Bot, Update
+import json
+import tempfile
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from telegram import Bot, LinkPreviewOptions, Update
 from telegram.ext import (
     ApplicationBuilder,
     CommandHandler,
     ContextTypes,
-    CallbackContext
+    CallbackContext,
+    Job
 )
-import datetime
+import time
 from functools import wraps
 
 # Initialize logging
@@ -17,29 +26,271 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default message used when the template has no usable placeholder
+DEFAULT_LINKS_HEADER = "<b>Updated Invite Links:</b>\n"
+
+def _render_default(links_list: str, first_link: str) -> str:
+    return DEFAULT_LINKS_HEADER + links_list
+
+def build_renderer(template: str, warn_legacy: bool = False) -> Callable[[str, str], str]:
+    """Pre-split the template around its placeholder and return a function
+    (links_list, first_link) -> message, so posting never re-parses the template.
+    Returns _render_default if the template can't be used.
+    warn_legacy logs a warning for owner-provided templates using {invite_link}."""
+    if "{links_list}" in template:
+        placeholder = "links_list"
+    elif "{invite_link}" in template: # Backward compatibility for old single link template
+        if warn_legacy:
+            logger.warning("Using old template with {invite_link}. Only the first link will be shown if multiple sources are set.")
+        placeholder = "invite_link"
+    else:
+        logger.info("No specific placeholder found. Using default multi-link format.")
+        return _render_default
+
+    # Format once with a marker so escaped braces are resolved exactly as .format() would
+    marker = "\x00"
+    try:
+        parts = tuple(template.format(**{placeholder: marker}).split(marker))
+    except (KeyError, IndexError, ValueError) as e:
+        logger.error(f"Message template formatting error. Likely missing other placeholders or bad template. Error: {e}")
+        logger.warning("Falling back to default multi-link format due to template error.")
+        return _render_default
+
+    if placeholder == "links_list":
+        def render(links_list: str, first_link: str) -> str:
+            return links_list.join(parts)
+    else:
+        def render(links_list: str, first_link: str) -> str:
+            return first_link.join(parts)
+    return render
+
 # Configuration storage
-CONFIG = {
-    "source_chats": [], # List of source chat IDs/usernames
-    "source_aliases": {}, # Dictionary mapping source_chat_id to its alias string
-    "target_channel": None,
-    "timer": 5,  # minutes
-    "user_limit": 1,
-    "message_template": "<b>Secure Access</b>: {invite_link}",
-    "last_message_id": None,  # Track last message ID for deletion
-    "active_job": None,  # Track active job
-    "update_mode": "replace"  # "edit" or "replace"
-}
+@dataclass(slots=True)
+class BotConfig:
+    source_chats: list[str] = field(default_factory=list) # List of source chat IDs/usernames
+    source_aliases: dict[str, str] = field(default_factory=dict) # Dictionary mapping source_chat_id to its alias string
+    source_display_names: list[str] = field(default_factory=list) # Alias or <code>id</code> per source chat, precomputed in set_channels
+    target_channel: Optional[str] = None
+    timer: int = 5  # minutes
+    user_limit: int = 1
+    message_template: str = "<b>Secure Access</b>: {invite_link}"
+    last_message_id: Optional[int] = None  # Track last message ID for deletion
+    last_formatted_message: Optional[str] = None  # Text of the last sent/edited message, to skip no-op edits
+    active_job: Optional[Job] = None  # Track active job
+    update_mode: str = "replace"  # "edit" or "replace"
+    render: Callable[[str, str], str] = field(init=False, repr=False)  # Built from message_template
+
+    def __post_init__(self):
+        self.render = build_renderer(self.message_template)
+
+CONFIG = BotConfig()
+
+# Shared by every send/edit that should not show a link preview
+_NO_PREVIEW = LinkPreviewOptions(is_disabled=True)
+
+# Cap on concurrent create_chat_invite_link calls, to stay within Telegram's rate limits
+INVITE_LINK_CONCURRENCY = 8
+
+# Parses "id_or_username:\"Alias Text\"" or "id_or_username:AliasText" or just "id_or_username"
+# It captures the ID/username, and optionally the alias (which can be quoted or unquoted).
+# Unquoted aliases cannot contain colons. Quoted aliases are preferred for spaces/special chars.
+# Group 1: chat_id_or_username
+# Group 2: quoted_alias (if quotes used)
+# Group 3: unquoted_alias (if no quotes used for alias)
+_SOURCE_PARSER = re.compile(r'([^:]+)(?::(?:\"([^\"]+)\"|([^:]+)))?$')
+
+# Valid chat identifier: @username or a (possibly negative) numeric chat ID, ASCII only like Telegram
+_IDENT_RE = re.compile(r'@\w+|-?\d+', re.ASCII)
+
+# Dummy data for the /set_template preview
+_DUMMY_INVITE_LINK = "t.me/joinchat/DUMMYINVITE123"
+_DUMMY_LINKS_LIST_STRING = "\n".join([
+    "My Channel Alias: t.me/joinchat/ALIASLINK",
+    "<code>@dummy_source_id</code>: t.me/joinchat/IDLINK",
+    "Another Alias: Not available"
+])
 
 # Get environment variables
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 OWNER_ID = os.getenv("OWNER_ID")
+# Telegram user IDs are ints; parsed once so owner checks are a plain int compare
+try:
+    OWNER_ID_INT = int(OWNER_ID) if OWNER_ID else None
+except ValueError:
+    OWNER_ID_INT = None  # Rejected in main()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # If unset, the bot falls back to polling
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+PORT = os.getenv("PORT", "8443")  # Webhook mode only; parsed in main()
+CONFIG_PATH = os.getenv("CONFIG_PATH", "config.json")
+
+# BotConfig fields written to CONFIG_PATH; the rest are runtime-only or derived on load
+PERSISTED_FIELDS = (
+    "source_chats", "source_aliases", "target_channel", "timer", "user_limit",
+    "message_template", "update_mode", "last_message_id"
+)
+# Config changes within this window are coalesced into a single write
+SAVE_DEBOUNCE_SECONDS = 0.1
+
+_save_requested: Optional[asyncio.Event] = None
+_save_lock = threading.Lock()
+_config_writer_task: Optional[asyncio.Task] = None
+
+def build_display_names(source_chats: list[str], source_aliases: dict[str, str]) -> list[str]:
+    """Alias, or the <code>-wrapped ID if there is none, for each source chat."""
+    return [source_aliases.get(src_id) or f"<code>{src_id}</code>" for src_id in source_chats]
+
+# Rendered "Source Chats" block for set_channels/get_config. Holds the list/dict it was
+# rendered from, so a changed block is detected by identity.
+_SOURCES_DISPLAY_CACHE = {"chats": None, "aliases": None, "value": None}
+
+def _render_sources_display() -> str:
+    """Source chat lines (with aliases) for display; rebuilt only after set_channels
+    or a config load replaces CONFIG.source_chats/CONFIG.source_aliases."""
+    cache = _SOURCES_DISPLAY_CACHE
+    if cache["chats"] is not CONFIG.source_chats or cache["aliases"] is not CONFIG.source_aliases:
+        aliases = CONFIG.source_aliases
+        lines = []
+        for src_id in CONFIG.source_chats:
+            alias = aliases.get(src_id)
+            lines.append(f"  - <code>{src_id}</code>" + (f" (Alias: \"{alias}\")" if alias else ""))
+        cache["value"] = "\n".join(lines)
+        cache["chats"] = CONFIG.source_chats
+        cache["aliases"] = aliases
+    return cache["value"]
+
+def _save_config():
+    """Atomically write the persisted config fields to CONFIG_PATH.
+    Runs in a worker thread as well as on shutdown, so saves are serialized by a lock."""
+    with _save_lock:
+        data = {name: getattr(CONFIG, name) for name in PERSISTED_FIELDS}
+        config_dir, config_name = os.path.split(os.path.abspath(CONFIG_PATH))
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=config_dir, prefix=f"{config_name}.", suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            try:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, CONFIG_PATH)
+
+def _check_source_chats(value):
+    if not isinstance(value, list) or not all(isinstance(s, str) and is_valid_channel_identifier(s) for s in value):
+        raise ValueError("expected a list of channel identifiers")
+    return value
+
+def _check_source_aliases(value):
+    if not isinstance(value, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in value.items()):
+        raise ValueError("expected a mapping of channel identifier to alias")
+    return value
+
+def _check_target_channel(value):
+    if value is not None and not (isinstance(value, str) and is_valid_channel_identifier(value)):
+        raise ValueError("expected a channel identifier or null")
+    return value
+
+def _check_positive_int(value):
+    # Same >= 1 rule as the /set_timer and /set_limit arguments; accepts "5" as well as 5
+    parsed = None
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        parsed = _parse_positive_int([str(value)])
+    if parsed is None:
+        raise ValueError("expected an integer >= 1")
+    return parsed
+
+def _check_message_template(value):
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("expected a non-empty string")
+    return value
+
+def _check_update_mode(value):
+    if value not in ("edit", "replace"):
+        raise ValueError('expected "edit" or "replace"')
+    return value
+
+def _check_last_message_id(value):
+    return None if value is None else _check_positive_int(value)
+
+# Validator for each persisted field: returns the (possibly coerced) value or raises ValueError
+_PERSISTED_FIELD_CHECKS = {
+    "source_chats": _check_source_chats,
+    "source_aliases": _check_source_aliases,
+    "target_channel": _check_target_channel,
+    "timer": _check_positive_int,
+    "user_limit": _check_positive_int,
+    "message_template": _check_message_template,
+    "update_mode": _check_update_mode,
+    "last_message_id": _check_last_message_id,
+}
+
+def _load_config():
+    """Restore persisted config fields from CONFIG_PATH, if it exists.
+    Invalid fields are logged and keep their defaults."""
+    try:
+        with open(CONFIG_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load config from {CONFIG_PATH}: {e}. Starting with defaults.")
+        return
+
+    if not isinstance(data, dict):
+        logger.error(f"Failed to load config from {CONFIG_PATH}: expected a JSON object. Starting with defaults.")
+        return
+
+    for name in PERSISTED_FIELDS:
+        if name not in data:
+            continue
+        try:
+            setattr(CONFIG, name, _PERSISTED_FIELD_CHECKS[name](data[name]))
+        except ValueError as e:
+            logger.error(f"Ignoring invalid {name!r} in {CONFIG_PATH} ({e}): {data[name]!r}. Keeping default.")
+    CONFIG.source_display_names = build_display_names(CONFIG.source_chats, CONFIG.source_aliases)
+    CONFIG.render = build_renderer(CONFIG.message_template, warn_legacy=True)
+    logger.info(f"Loaded config from {CONFIG_PATH}")
+
+def request_config_save():
+    """Mark the config as changed; the writer task saves it shortly after."""
+    if _save_requested is not None:
+        _save_requested.set()
+
+async def _config_writer():
+    """Write the config whenever a save is requested, debounced by SAVE_DEBOUNCE_SECONDS."""
+    while True:
+        await _save_requested.wait()
+        await asyncio.sleep(SAVE_DEBOUNCE_SECONDS) # Let a burst of changes settle first
+        _save_requested.clear()
+        try:
+            await asyncio.to_thread(_save_config)
+        except OSError as e:
+            logger.error(f"Failed to save config to {CONFIG_PATH}: {e}")
+
+async def post_init(app):
+    """Start the background config writer once the event loop is running."""
+    global _save_requested, _config_writer_task
+    _save_requested = asyncio.Event()
+    _config_writer_task = asyncio.get_running_loop().create_task(_config_writer())
+
+async def post_shutdown(app):
+    """Stop the config writer and flush any save it had not got to yet."""
+    if _config_writer_task is not None:
+        _config_writer_task.cancel()
+    if _save_requested is not None and _save_requested.is_set():
+        try:
+            _save_config()
+        except OSError as e:
+            logger.error(f"Failed to save config to {CONFIG_PATH}: {e}")
 
 # Security decorator for owner-only commands
 def owner_only(func):
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        user_id = str(update.effective_user.id)
-        if user_id != OWNER_ID:
+        if update.effective_user.id != OWNER_ID_INT:
             await update.message.reply_text("⛔ Unauthorized: This command is owner-only")
             return
         return await func(update, context, *args, **kwargs)
@@ -47,13 +298,18 @@ def owner_only(func):
 
 def is_valid_channel_identifier(identifier):
     """Check if identifier is valid (ID or username)"""
-    return (identifier.startswith('@') or 
-            identifier.startswith('-') or 
-            identifier.lstrip('-').isdigit())
+    return _IDENT_RE.fullmatch(identifier) is not None
+
+def _parse_positive_int(args):
+    """Parse the first command argument as an int >= 1, or return None"""
+    # isdecimal() only accepts characters int() can parse, so no exception handling is needed
+    if not args or not args[0].isdecimal():
+        return None
+    value = int(args[0])
+    return value if value >= 1 else None
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Initial welcome with detailed command overview"""
-    user_id = str(update.effective_user.id)
     help_text = """
 🚀 <b>LinkGuard Bot - Admin Commands</b>
 
@@ -103,7 +359,7 @@ The bot can either <b>edit</b> the existing message with a new invite link or <b
 Use /toggle_update_mode to switch between these behaviors.
 Current mode is shown in /get_config.
 """
-    if user_id == OWNER_ID:
+    if update.effective_user.id == OWNER_ID_INT:
         await update.message.reply_text(help_text, parse_mode="HTML")
     else:
         await update.message.reply_text(
@@ -138,18 +394,8 @@ async def set_channels(update: Update, context: ContextTypes.DEFAULT_TYPE):
     new_source_aliases = {}
     errors = []
 
-    # Regex to parse "id_or_username:\"Alias Text\"" or "id_or_username:AliasText" or just "id_or_username"
-    # It tries to capture the ID/username, and optionally the alias (which can be quoted or unquoted).
-    # Unquoted aliases cannot contain colons. Quoted aliases are preferred for spaces/special chars.
-    import re
-    # Pattern: (id_or_username) (optional : (optional "alias_text" or alias_text_no_quote))
-    # Group 1: chat_id_or_username
-    # Group 3: quoted_alias (if quotes used)
-    # Group 4: unquoted_alias (if no quotes used for alias)
-    source_parser = re.compile(r'([^:]+)(?::(?:\"([^\"]+)\"|([^:]+)))?$')
-
     for src_def_arg in source_definitions_args:
-        match = source_parser.fullmatch(src_def_arg)
+        match = _SOURCE_PARSER.fullmatch(src_def_arg)
         if not match:
             errors.append(f"Invalid format for source definition: <code>{src_def_arg}</code>")
             continue
@@ -176,22 +422,18 @@ async def set_channels(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ No valid source channels provided or parsed.")
         return
 
-    CONFIG["target_channel"] = target_channel_arg
-    CONFIG["source_chats"] = new_source_chats
-    CONFIG["source_aliases"] = new_source_aliases # Overwrite with new aliases
+    CONFIG.target_channel = target_channel_arg
+    CONFIG.source_chats = new_source_chats
+    CONFIG.source_aliases = new_source_aliases # Overwrite with new aliases
+    CONFIG.last_formatted_message = None # Target may have changed, so never skip the next edit
+    CONFIG.source_display_names = build_display_names(new_source_chats, new_source_aliases)
+    request_config_save()
 
-    sources_display_parts = []
-    for src_id in CONFIG["source_chats"]:
-        alias_text = CONFIG["source_aliases"].get(src_id)
-        if alias_text:
-            sources_display_parts.append(f"  - <code>{src_id}</code> (Alias: \"{alias_text}\")")
-        else:
-            sources_display_parts.append(f"  - <code>{src_id}</code>")
-    sources_display = "\n".join(sources_display_parts)
+    sources_display = _render_sources_display()
 
     await update.message.reply_text(
         "✅ <b>Channels Configured</b>\n"
-        f"<b>Target Channel</b>: <code>{CONFIG['target_channel']}</code>\n"
+        f"<b>Target Channel</b>: <code>{CONFIG.target_channel}</code>\n"
         f"<b>Source Chats & Aliases</b>:\n{sources_display}",
         parse_mode="HTML"
     )
@@ -199,48 +441,33 @@ async def set_channels(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @owner_only
 async def set_timer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Set regeneration interval"""
-    try:
-        minutes = int(context.args[0])
-        if minutes < 1:
-            raise ValueError
-        CONFIG["timer"] = minutes
-        await update.message.reply_text(f"⏰ Timer set to {minutes} minutes")
-    except (IndexError, ValueError):
+    minutes = _parse_positive_int(context.args)
+    if minutes is None:
         await update.message.reply_text("❌ Usage: /set_timer <minutes> (minimum 1)")
+        return
+    CONFIG.timer = minutes
+    request_config_save()
+    await update.message.reply_text(f"⏰ Timer set to {minutes} minutes")
 
 @owner_only
 async def set_limit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Set max users per link"""
-    try:
-        limit = int(context.args[0])
-        if limit < 1:
-            raise ValueError
-        CONFIG["user_limit"] = limit
-        await update.message.reply_text(f"👥 User limit set to {limit}")
-    except (IndexError, ValueError):
+    limit = _parse_positive_int(context.args)
+    if limit is None:
         await update.message.reply_text("❌ Usage: /set_limit <number> (minimum 1)")
+        return
+    CONFIG.user_limit = limit
+    request_config_save()
+    await update.message.reply_text(f"👥 User limit set to {limit}")
 
 @owner_only
 async def set_template(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Set HTML message template with formatting support"""
 
-    # Extract the template text more reliably for multi-line input
-    command_text = "/set_template" # Assuming this is how the command is registered
-    # Find the command in the message text to get its length accurately,
-    # especially if it was called with the bot's username (e.g., /set_template@MyBotName)
-    if update.message.entities and update.message.entities[0].type == "bot_command":
-        command_entity = update.message.entities[0]
-        actual_command_invoked = update.message.text[command_entity.offset : command_entity.offset + command_entity.length]
-        # Use the length of the actual command invoked to split off the arguments
-        raw_template_text = update.message.text[len(actual_command_invoked):].strip()
-    else: # Fallback if not a typical command entity (e.g. testing, direct call)
-        # This fallback might not be perfect if bot username is used without being an entity
-        if update.message.text.lower().startswith(command_text):
-             raw_template_text = update.message.text[len(command_text):].strip()
-        else: # Should not happen if handler is correct
-            logger.warning(f"Could not determine command in set_template: {update.message.text}")
-            raw_template_text = " ".join(context.args) # Original method as last resort
-
+    # Everything after the command token is the template. Splitting on the first run of
+    # whitespace handles /set_template@MyBotName and a newline right after the command.
+    command_and_args = update.message.text.split(None, 1)
+    raw_template_text = command_and_args[1].strip() if len(command_and_args) > 1 else ""
 
     if not raw_template_text:
         await update.message.reply_text(
@@ -251,93 +478,33 @@ async def set_template(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    CONFIG["message_template"] = raw_template_text
+    CONFIG.message_template = raw_template_text
+    CONFIG.render = build_renderer(raw_template_text, warn_legacy=True)
+    request_config_save()
 
     # Generate a more comprehensive preview
-    preview_parts = [f"📝 <b>Template Set</b>", f"<b>Raw</b>: <code>{CONFIG['message_template']}</code>\n"]
-
-    # Create dummy data for placeholders
-    dummy_invite_link = "t.me/joinchat/DUMMYINVITE123"
-    dummy_links_list_parts = [
-        "My Channel Alias: t.me/joinchat/ALIASLINK",
-        "<code>@dummy_source_id</code>: t.me/joinchat/IDLINK",
-        "Another Alias: Not available"
-    ]
-    dummy_links_list_string = "\n".join(dummy_links_list_parts)
-
-    preview_text_final = "Could not render preview (template might be missing placeholders or have other issues)."
-
-    # Attempt to format with {links_list} first, then {invite_link} if applicable
-    # This allows templates with both, though {links_list} is preferred.
-    try:
-        if "{links_list}" in CONFIG["message_template"]:
-            # If other placeholders are present, format might fail.
-            # We only provide {links_list} and {invite_link} for this preview.
-            temp_preview_template = CONFIG["message_template"]
-            # Provide both, but one might not be used by the template.
-            available_placeholders = {"links_list": dummy_links_list_string, "invite_link": dummy_invite_link}
-
-            # A simple way to fill only available placeholders to avoid KeyError for others
-            # This isn't a full templating engine, so it's a basic preview.
-            # For a more robust preview, one might need to parse the template for all placeholders.
-            # For now, we will try to format with what we have.
-            # A common issue is if template has e.g. {foo} but we don't provide dummy_foo.
-            # We can try to provide them if they are known, or make the .format() more robust.
-
-            # Simplistic approach: if it contains {links_list}, assume it's the primary.
-            # If it also contains {invite_link}, that one will be ignored by .format if {links_list} is the only one used.
-            # This is tricky. Let's try to format with both if both placeholders are in the template.
-            # A better way is to replace known placeholders sequentially.
-
-            # Create a dictionary of placeholders we can fill for the preview
-            preview_format_args = {}
-            preview_template_for_formatting = CONFIG["message_template"]
-
-            if "{links_list}" in preview_template_for_formatting:
-                preview_format_args["links_list"] = dummy_links_list_string
-            if "{invite_link}" in preview_template_for_formatting:
-                preview_format_args["invite_link"] = dummy_invite_link
-
-            if not preview_format_args: # Neither known placeholder is in the template
-                 preview_text_final = "Preview: (Template does not use {links_list} or {invite_link})"
-            else:
-                try:
-                    # This will raise KeyError if other unknown placeholders exist
-                    preview_text_final = preview_template_for_formatting.format(**preview_format_args)
-                except KeyError as e:
-                    logger.warning(f"KeyError during template preview formatting: {e}. User template might have other placeholders.")
-                    preview_text_final = (f"Preview: (Could not fully render due to missing key: {e}. "
-                                          f"Showing partial if possible, or check template for unknown placeholders like {{{e.key}}})")
-                    # Try to replace known ones sequentially for a partial preview
-                    temp_str = preview_template_for_formatting
-                    if "{links_list}" in temp_str and "links_list" in preview_format_args:
-                        temp_str = temp_str.replace("{links_list}", preview_format_args["links_list"])
-                    if "{invite_link}" in temp_str and "invite_link" in preview_format_args:
-                        temp_str = temp_str.replace("{invite_link}", preview_format_args["invite_link"])
-                    preview_text_final = temp_str
-
-
-        elif "{invite_link}" in CONFIG["message_template"]: # Only {invite_link}
-            preview_text_final = CONFIG["message_template"].format(invite_link=dummy_invite_link)
-        else:
-            preview_text_final = CONFIG["message_template"] # No known placeholders, show as is
+    preview_parts = [f"📝 <b>Template Set</b>", f"<b>Raw</b>: <code>{CONFIG.message_template}</code>\n"]
 
-    except Exception as e:
-        logger.error(f"Error during template preview generation: {e}")
-        preview_text_final = f"Preview: (Error rendering preview: {e})"
+    # Render through the same function the posts use, so the preview matches real output
+    if CONFIG.render is _render_default:
+        preview_parts.append(
+            "⚠️ The template has no usable {links_list} or {invite_link} placeholder "
+            "(or uses unknown ones), so posts will use the default format below instead."
+        )
+    preview_text_final = CONFIG.render(_DUMMY_LINKS_LIST_STRING, _DUMMY_INVITE_LINK)
 
     preview_parts.append(f"<b>Preview with dummy data</b> (actual output may vary based on # of sources and aliases):\n{preview_text_final}")
 
-    await update.message.reply_text("\n".join(preview_parts), parse_mode="HTML", disable_web_page_preview=True)
+    await update.message.reply_text("\n".join(preview_parts), parse_mode="HTML", link_preview_options=_NO_PREVIEW)
 
 async def generate_invite_link_for_chat(bot: Bot, chat_id: str):
     """Generate new invite link for a specific chat with current global config for timer/limit."""
-    expire_time = datetime.datetime.now() + datetime.timedelta(minutes=CONFIG["timer"])
+    expire_time = int(time.time()) + CONFIG.timer * 60 # Unix timestamp, accepted by the Bot API as-is
     try:
         result = await bot.create_chat_invite_link(
             chat_id=chat_id,
             expire_date=expire_time,
-            member_limit=CONFIG["user_limit"]
+            member_limit=CONFIG.user_limit
         )
         logger.info(f"Successfully generated invite link for chat_id: {chat_id}")
         return result.invite_link
@@ -346,27 +513,35 @@ async def generate_invite_link_for_chat(bot: Bot, chat_id: str):
         return None
 
 async def generate_all_invite_links(bot: Bot) -> list[str | None]:
-    """Generates invite links for all configured source chats."""
-    links = []
-    for source_chat_id in CONFIG.get("source_chats", []):
-        link = await generate_invite_link_for_chat(bot, source_chat_id)
-        links.append(link) # Appends the link or None if generation failed
-    return links
+    """Generates invite links for all configured source chats concurrently.
+    The returned list keeps the order of CONFIG.source_chats."""
+    semaphore = asyncio.Semaphore(INVITE_LINK_CONCURRENCY)
+
+    async def limited(source_chat_id):
+        async with semaphore:
+            return await generate_invite_link_for_chat(bot, source_chat_id)
+
+    results = await asyncio.gather(
+        *(limited(source_chat_id) for source_chat_id in CONFIG.source_chats),
+        return_exceptions=True
+    )
+    # The link, or None if generation failed for that source
+    return [None if isinstance(result, BaseException) else result for result in results]
 
 @owner_only
 async def start_posting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Begin auto-posting with link regeneration"""
     # Validate configuration
-    if not CONFIG.get("source_chats") or not CONFIG.get("target_channel"):
+    if not CONFIG.source_chats or not CONFIG.target_channel:
         await update.message.reply_text(
             "❌ Configure target channel and at least one source chat first using /set_channels"
         )
         return
     
     # Stop any existing job
-    if CONFIG["active_job"]:
-        CONFIG["active_job"].schedule_removal()
-        CONFIG["active_job"] = None
+    if CONFIG.active_job:
+        CONFIG.active_job.schedule_removal()
+        CONFIG.active_job = None
     
     # Create first post immediately
     await post_new_link(context.bot, source="start_posting_initial")
@@ -374,10 +549,10 @@ async def start_posting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Start regeneration job
     job = context.job_queue.run_repeating(
         post_new_link_job,
-        interval=CONFIG["timer"] * 60,
-        first=CONFIG["timer"] * 60,  # Wait for timer before next post
+        interval=CONFIG.timer * 60,
+        first=CONFIG.timer * 60,  # Wait for timer before next post
     )
-    CONFIG["active_job"] = job
+    CONFIG.active_job = job
     logger.info(f"Job '{job.name}' scheduled. Next run at: {job.next_t}. Interval: {job.interval}s. Repeat: {job.repeat}")
     
     await update.message.reply_text("🔄 Auto-posting activated!")
@@ -386,6 +561,10 @@ async def post_new_link(bot: Bot, source: str = "unknown"):
     """Create new post with fresh link, either by editing or replacing."""
     logger.info(f"post_new_link called from: {source}") # Diagnostic log
 
+    # Snapshot the config once for this tick
+    target = CONFIG.target_channel
+    display_names = CONFIG.source_display_names
+
     new_links_list = await generate_all_invite_links(bot) # Changed to get a list of links
 
     # Filter out None values in case some link generations failed
@@ -400,90 +579,82 @@ async def post_new_link(bot: Bot, source: str = "unknown"):
     # Format the message using the new {links_list} placeholder
     # The actual links_list content is prepared based on valid_new_links and source_chats
 
-    links_display_parts = []
-    source_chat_ids = CONFIG.get("source_chats", [])
-    source_aliases_map = CONFIG.get("source_aliases", {})
-
-    for i, link_url in enumerate(new_links_list): # Iterate over original list to match with source_chat_ids
-        source_id_or_username = source_chat_ids[i] if i < len(source_chat_ids) else f"Unknown Source {i+1}"
-        display_name = source_aliases_map.get(source_id_or_username, f"<code>{source_id_or_username}</code>")
-
-        # Ensure display_name is HTML-safe if it's an alias that might contain < or >
-        # For simplicity, we assume aliases are plain text or already safe.
-        # A more robust solution would use html.escape on aliases if they are user-provided free text.
-        # However, since our alias parsing doesn't allow HTML tags within them, this might be okay.
-        # If an alias itself is `<b>Cool</b>`, it will render as `<b>Cool</b>: link`.
-        # If an alias is `Cool&Stuff`, it will render as `Cool&Stuff: link`.
-        # The `<code>` tags are only for non-aliased IDs.
-
-        if link_url: # If link generation was successful
-            links_display_parts.append(f"{display_name}: {link_url}")
-        else: # If link generation failed for this source
-            links_display_parts.append(f"{display_name}: Not available")
-
-    links_list_string = "\n".join(links_display_parts)
+    # Display names are precomputed in set_channels, in the same order as source_chats
+    # (and therefore as new_links_list).
+    # Aliases are assumed to be plain text or already HTML-safe; since our alias parsing
+    # doesn't allow HTML tags within them, this might be okay. The `<code>` tags are
+    # only for non-aliased IDs.
+    # A failed generation for a source shows "Not available"
+    links_list_string = "\n".join(
+        f"{display_name}: {link_url if link_url else 'Not available'}"
+        for display_name, link_url in zip(display_names, new_links_list)
+    )
 
-    if "{links_list}" in CONFIG["message_template"]:
-        try:
-            formatted_message = CONFIG["message_template"].format(links_list=links_list_string)
-        except KeyError as e:
-            logger.error(f"Message template formatting error. Likely missing other placeholders or bad template. Error: {e}")
-            logger.warning("Falling back to default multi-link format due to template error.")
-            formatted_message = f"<b>Updated Invite Links:</b>\n{links_list_string}"
-    elif valid_new_links and "{invite_link}" in CONFIG["message_template"]: # Backward compatibility for old single link template
-        logger.warning("Using old template with {invite_link} for multi-link scenario. Only first link will be shown.")
-        formatted_message = CONFIG["message_template"].format(invite_link=valid_new_links[0])
-    else:
-        logger.info("No specific placeholder found. Using default multi-link format.")
-        formatted_message = f"<b>Updated Invite Links:</b>\n{links_list_string}"
+    formatted_message = CONFIG.render(links_list_string, valid_new_links[0])
 
-    update_mode = CONFIG.get("update_mode", "replace") # Default to replace if not set
+    # Read only after link generation: another tick may have posted while we awaited
+    last_id = CONFIG.last_message_id
+    mode = CONFIG.update_mode
 
-    if update_mode == "edit" and CONFIG["last_message_id"]:
+    if mode == "edit" and last_id:
+        if formatted_message == CONFIG.last_formatted_message:
+            # Telegram would reject the edit with "message is not modified" anyway
+            logger.info(f"Message ID: {last_id} already up to date, skipping edit.")
+            return
         try:
             await bot.edit_message_text(
-                chat_id=CONFIG["target_channel"],
-                message_id=CONFIG["last_message_id"],
+                chat_id=target,
+                message_id=last_id,
                 text=formatted_message,
                 parse_mode="HTML",
-                disable_web_page_preview=True
+                link_preview_options=_NO_PREVIEW
             )
-            logger.info(f"Edited message ID: {CONFIG['last_message_id']} in chat {CONFIG['target_channel']} (link preview disabled)")
+            CONFIG.last_formatted_message = formatted_message
+            logger.info(f"Edited message ID: {last_id} in chat {target} (link preview disabled)")
             return # Successfully edited, no need to update last_message_id
         except Exception as e:
-            logger.error(f"Failed to edit message {CONFIG['last_message_id']}: {e}. Falling back to replace.")
+            logger.error(f"Failed to edit message {last_id}: {e}. Falling back to replace.")
             # Fallback to delete and send new if edit fails
             # No explicit 'else' needed here, will proceed to delete-and-send logic
 
     # "replace" mode or fallback from "edit"
-    # Delete previous message if it exists
-    if CONFIG["last_message_id"]:
+    # Delete the previous message (if any) and send the new one concurrently;
+    # Telegram doesn't require the delete to land first.
+    CONFIG.last_message_id = None # Ensure it's cleared even if deletion fails, to prevent issues
+    request_config_save()
+
+    send_coro = bot.send_message(
+        chat_id=target,
+        text=formatted_message,
+        parse_mode="HTML",
+        link_preview_options=_NO_PREVIEW
+    )
+    if last_id:
+        delete_result, sent_message = await asyncio.gather(
+            bot.delete_message(chat_id=target, message_id=last_id),
+            send_coro,
+            return_exceptions=True # A failed delete must not cancel the send
+        )
+        if isinstance(delete_result, BaseException):
+            logger.error(f"Failed to delete message {last_id} for replacement: {delete_result}")
+        else:
+            logger.info(f"Deleted previous message: {last_id} for replacement.")
+    else:
         try:
-            await bot.delete_message(
-                chat_id=CONFIG["target_channel"],
-                message_id=CONFIG["last_message_id"]
-            )
-            logger.info(f"Deleted previous message: {CONFIG['last_message_id']} for replacement.")
+            sent_message = await send_coro
         except Exception as e:
-            logger.error(f"Failed to delete message {CONFIG['last_message_id']} for replacement: {e}")
-        finally:
-            CONFIG["last_message_id"] = None # Ensure it's cleared even if deletion failed, to prevent issues
+            sent_message = e
 
-    # Send new message
-    try:
-        sent_message = await bot.send_message(
-            chat_id=CONFIG["target_channel"],
-            text=formatted_message,
-            parse_mode="HTML",
-            disable_web_page_preview=True
-        )
-        CONFIG["last_message_id"] = sent_message.message_id
-        logger.info(f"Posted new message ID: {sent_message.message_id} in chat {CONFIG['target_channel']} (link preview disabled)")
-    except Exception as e:
-        logger.error(f"Failed to post new message in {CONFIG['target_channel']}: {e}")
+    if isinstance(sent_message, BaseException):
+        logger.error(f"Failed to post new message in {target}: {sent_message}")
         # Optionally, notify the owner if posting fails
-        # await bot.send_message(chat_id=OWNER_ID, text=f"Error: Failed to post new message to {CONFIG['target_channel']}.")
+        # await bot.send_message(chat_id=OWNER_ID, text=f"Error: Failed to post new message to {target}.")
+        return
 
+    CONFIG.last_message_id = sent_message.message_id
+    CONFIG.last_formatted_message = formatted_message
+    request_config_save()
+    logger.info(f"Posted new message ID: {sent_message.message_id} in chat {target} (link preview disabled)")
 
 async def post_new_link_job(context: ContextTypes.DEFAULT_TYPE):
     """Job handler for posting new links"""
@@ -493,20 +664,21 @@ async def post_new_link_job(context: ContextTypes.DEFAULT_TYPE):
 @owner_only
 async def stop_posting(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Halt auto-regeneration"""
-    if not CONFIG["active_job"]:
+    if not CONFIG.active_job:
         await update.message.reply_text("❌ No active posting job")
         return
     
-    CONFIG["active_job"].schedule_removal()
-    CONFIG["active_job"] = None
+    CONFIG.active_job.schedule_removal()
+    CONFIG.active_job = None
     await update.message.reply_text("⏹️ Auto-posting stopped")
 
 @owner_only
 async def toggle_update_mode(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Toggle message update mode between 'edit' and 'replace'."""
-    current_mode = CONFIG.get("update_mode", "replace")
+    current_mode = CONFIG.update_mode
     new_mode = "edit" if current_mode == "replace" else "replace"
-    CONFIG["update_mode"] = new_mode
+    CONFIG.update_mode = new_mode
+    request_config_save()
     await update.message.reply_text(
         f"⚙️ Message update mode set to: <b>{new_mode.upper()}</b>\n\n"
         f"<b>EDIT Mode</b>: The bot will try to edit the last sent message with the new link.\n"
@@ -532,31 +704,22 @@ async def get_config(update: Update, context: ContextTypes.DEFAULT_TYPE):
 <b>Last Message ID</b>: {disp_last_message_id}
 """ # Renamed placeholders
 
-    job_status_display = "✅ Running" if CONFIG.get("active_job") else "❌ Stopped"
-    last_message_id_display = CONFIG.get("last_message_id") or "None"
-    update_mode_display = CONFIG.get("update_mode", "replace").upper()
-
-    source_chats_list = CONFIG.get("source_chats", [])
-    source_aliases_map = CONFIG.get("source_aliases", {})
-    source_display_lines = []
-    if source_chats_list:
-        for src_id in source_chats_list:
-            alias = source_aliases_map.get(src_id)
-            if alias:
-                source_display_lines.append(f"  - <code>{src_id}</code> (Alias: \"{alias}\")")
-            else:
-                source_display_lines.append(f"  - <code>{src_id}</code>")
-        cfg_source_chats_display_val = "\n".join(source_display_lines)
+    job_status_display = "✅ Running" if CONFIG.active_job else "❌ Stopped"
+    last_message_id_display = CONFIG.last_message_id or "None"
+    update_mode_display = CONFIG.update_mode.upper()
+
+    if CONFIG.source_chats:
+        cfg_source_chats_display_val = _render_sources_display()
     else:
         cfg_source_chats_display_val = "  No source chats configured."
 
     formatting_args = {
         "cfg_source_chats_display": cfg_source_chats_display_val,
-        "cfg_target_channel": CONFIG.get("target_channel") or "Not Set",
-        "cfg_timer": CONFIG.get("timer", 0),
-        "cfg_user_limit": CONFIG.get("user_limit", 0),
+        "cfg_target_channel": CONFIG.target_channel or "Not Set",
+        "cfg_timer": CONFIG.timer,
+        "cfg_user_limit": CONFIG.user_limit,
         "disp_update_mode": update_mode_display,
-        "cfg_message_template": CONFIG.get("message_template") or "Not Set",
+        "cfg_message_template": CONFIG.message_template or "Not Set",
         "disp_job_status": job_status_display,
         "disp_last_message_id": last_message_id_display
     }
@@ -578,9 +741,25 @@ def main():
     
     if not OWNER_ID:
         logger.warning("OWNER_ID not set - all users can access admin commands!")
+    elif OWNER_ID_INT is None:
+        logger.error(f"OWNER_ID must be a numeric Telegram user ID, got: {OWNER_ID}")
+        return
+
+    # Restore settings from the previous run
+    _load_config()
     
     # Create Application using ApplicationBuilder
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        # Keep the builder's default Bot API pool; HTTP/2 lets concurrent requests share one connection
+        .http_version("2")
+        .get_updates_http_version("2")
+        .pool_timeout(5.0)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # Command handlers
     app.add_handler(CommandHandler("start", start))
@@ -597,9 +776,25 @@ def main():
     # Error handling
     app.add_error_handler(error_handler)
 
-    # Start polling
-    logger.info("Bot started polling...")
-    app.run_polling()
+    if WEBHOOK_URL:
+        try:
+            port = int(PORT)
+        except ValueError:
+            logger.error(f"PORT must be a number, got: {PORT}")
+            return
+        # Telegram pushes updates to us, so there is no getUpdates traffic while idle
+        logger.info(f"Bot started webhook on port {port} for {WEBHOOK_URL}...")
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=port,
+            url_path=urllib.parse.urlparse(WEBHOOK_URL).path.lstrip("/"), # Serve the path Telegram will POST to
+            webhook_url=WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET
+        )
+    else:
+        # Start polling
+        logger.info("Bot started polling...")
+        app.run_polling()
 
 if __name__ == '__main__':
     main()